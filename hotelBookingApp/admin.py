@@ -2,9 +2,32 @@
 """
 
 from django.contrib import admin
+from django.db import transaction
 
+from .caching import invalidate_available_rooms, invalidate_room_list
 from .models import Booking, Payment, Room
 
 admin.site.register(Booking)
-admin.site.register(Room)
 admin.site.register(Payment)
+
+
+@admin.register(Room)
+class RoomAdmin(admin.ModelAdmin):
+    """Admin for rooms with a bulk action to add more rooms of the same type
+    """
+    actions = ['duplicate_rooms']
+
+    @admin.action(description="Duplicate selected rooms")
+    def duplicate_rooms(self, request, queryset):
+        """Create a copy of each selected room, inserted in batches
+        """
+        rooms = [
+            Room(room_type=room.room_type, price_per_night=room.price_per_night)
+            for room in queryset
+        ]
+        Room.objects.bulk_create(rooms, batch_size=500) # pylint: disable=no-member
+        # bulk_create does not send post_save, so drop the cached data here,
+        # once the new rooms are committed
+        transaction.on_commit(invalidate_room_list)
+        transaction.on_commit(invalidate_available_rooms)
+        self.message_user(request, f"{len(rooms)} rooms created.")
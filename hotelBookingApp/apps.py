@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class HotelbookingappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hotelBookingApp'
+
+    def ready(self):
+        # Connect the signal handlers
+        from . import signals  # pylint: disable=import-outside-toplevel,unused-import
@@ -0,0 +1,43 @@
+"""Module for the cache keys shared by the views and the signal handlers.
+"""
+
+from uuid import uuid4
+
+from django.core.cache import cache
+
+# Cached response of the room list endpoint. The key includes a version that
+# is replaced to invalidate it, so a rebuild that read the rooms before the
+# change was committed is stored under the old version and never served.
+ROOM_LIST_VERSION_KEY = 'rooms:list:version'
+ROOM_LIST_TIMEOUT = 60 * 5  # 5 minutes
+
+# Cached responses of the available rooms endpoint, one per query. The keys
+# include a version that is replaced to invalidate all of them at once.
+AVAILABLE_ROOMS_VERSION_KEY = 'rooms:available:version'
+AVAILABLE_ROOMS_TIMEOUT = 60  # 1 minute
+
+
+def room_list_key():
+    """Return the cache key of the current room list
+    """
+    version = cache.get_or_set(ROOM_LIST_VERSION_KEY, lambda: uuid4().hex, None)
+    return f"rooms:list:{version}"
+
+
+def invalidate_room_list():
+    """Drop the cached room list by replacing the key version
+    """
+    cache.set(ROOM_LIST_VERSION_KEY, uuid4().hex, None)
+
+
+def available_rooms_key(check_in_date, check_out_date, room_type):
+    """Return the cache key of the available rooms for the given query
+    """
+    version = cache.get_or_set(AVAILABLE_ROOMS_VERSION_KEY, lambda: uuid4().hex, None)
+    return f"rooms:available:{version}:{check_in_date}:{check_out_date}:{room_type or ''}"
+
+
+def invalidate_available_rooms():
+    """Drop every cached available rooms response by replacing the key version
+    """
+    cache.set(AVAILABLE_ROOMS_VERSION_KEY, uuid4().hex, None)
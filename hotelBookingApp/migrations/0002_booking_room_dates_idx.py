@@ -0,0 +1,19 @@
+# Generated by Django 5.1.5 on 2026-10-15 22:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotelBookingApp', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['room', 'check_in_date', 'check_out_date'], name='booking_room_dates_idx'),
+        ),
+    ]
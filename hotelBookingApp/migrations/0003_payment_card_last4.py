@@ -0,0 +1,40 @@
+# Generated by Django 5.1.5 on 2026-10-15 22:00
+
+from django.db import migrations, models
+
+
+def copy_card_last4(apps, schema_editor):
+    """Keep the last four digits of the (already masked) stored card numbers."""
+    Payment = apps.get_model('hotelBookingApp', 'Payment')
+    for payment in Payment.objects.only('card_number'):
+        payment.card_last4 = payment.card_number.strip()[-4:]
+        payment.save(update_fields=['card_last4'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotelBookingApp', '0002_booking_room_dates_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='card_last4',
+            field=models.CharField(default='', help_text='Last four digits of the card', max_length=4),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_card_last4, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='payment',
+            name='card_cvv',
+        ),
+        migrations.RemoveField(
+            model_name='payment',
+            name='card_expiry',
+        ),
+        migrations.RemoveField(
+            model_name='payment',
+            name='card_number',
+        ),
+    ]
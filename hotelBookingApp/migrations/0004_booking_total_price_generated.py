@@ -0,0 +1,49 @@
+# Generated by Django 5.1.5 on 2026-10-15 22:04
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+def copy_price_per_night(apps, schema_editor):
+    """Recover each booking's nightly price from its stored total, falling
+    back to the room's current price when no total was recorded."""
+    Booking = apps.get_model('hotelBookingApp', 'Booking')
+    for booking in Booking.objects.select_related('room'):
+        num_nights = max((booking.check_out_date - booking.check_in_date).days, 1)
+        if booking.total_booking_price is not None:
+            booking.price_per_night = booking.total_booking_price / num_nights
+        else:
+            booking.price_per_night = booking.room.price_per_night
+        booking.save(update_fields=['price_per_night'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotelBookingApp', '0003_payment_card_last4'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='price_per_night',
+            field=models.DecimalField(decimal_places=2, editable=False, help_text="The room's price per night when the booking was made.", max_digits=10, null=True),
+        ),
+        migrations.RunPython(copy_price_per_night, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='booking',
+            name='price_per_night',
+            field=models.DecimalField(decimal_places=2, editable=False, help_text="The room's price per night when the booking was made.", max_digits=10),
+        ),
+        migrations.RemoveField(
+            model_name='booking',
+            name='total_booking_price',
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='total_booking_price',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Greatest(django.db.models.functions.datetime.ExtractDay(django.db.models.expressions.CombinedExpression(models.F('check_out_date'), '-', models.F('check_in_date'))), models.Value(1)), '*', models.F('price_per_night')), output_field=models.DecimalField(decimal_places=2, max_digits=10)),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.5 on 2026-10-15 22:08
+
+from django.db import migrations, models
+
+
+def copy_username(apps, schema_editor):
+    """Fill the username snapshot of existing bookings from their user."""
+    Booking = apps.get_model('hotelBookingApp', 'Booking')
+    for booking in Booking.objects.select_related('user'):
+        booking.username_snapshot = booking.user.username
+        booking.save(update_fields=['username_snapshot'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotelBookingApp', '0004_booking_total_price_generated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='username_snapshot',
+            field=models.CharField(default='', editable=False, max_length=150),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_username, migrations.RunPython.noop),
+    ]
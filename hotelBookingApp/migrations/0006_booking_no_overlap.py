@@ -0,0 +1,53 @@
+# Generated by Django 5.1.5 on 2026-10-15 22:08
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.operations
+import django.db.models.expressions
+import django.db.models.functions.comparison
+import hotelBookingApp.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+def check_no_overlapping_bookings(apps, schema_editor):
+    """Fail with the offending bookings if any would violate the constraint.
+
+    Bookings saved before this migration were only checked with a strict
+    overlap test, which let a same-day booking through on the day another
+    booking of the room starts. Those rows must be moved or deleted first.
+    """
+    Booking = apps.get_model('hotelBookingApp', 'Booking')
+    table = schema_editor.quote_name(Booking._meta.db_table)
+    nights = "daterange({0}.check_in_date, GREATEST({0}.check_out_date, {0}.check_in_date + 1))"
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT a.id, b.id FROM {table} a JOIN {table} b "
+            f"ON a.room_id = b.room_id AND a.id < b.id "
+            f"AND {nights.format('a')} && {nights.format('b')} "
+            f"ORDER BY a.id, b.id"
+        )
+        overlapping = cursor.fetchall()
+    if overlapping:
+        pairs = ", ".join(f"{first} and {second}" for first, second in overlapping)
+        raise RuntimeError(
+            "Cannot add the booking_no_overlap constraint, these bookings hold the "
+            f"same room on the same night: {pairs}. Change the dates or delete one "
+            "booking of each pair, then run the migration again."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotelBookingApp', '0005_booking_username_snapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.BtreeGistExtension(),
+        migrations.RunPython(check_no_overlapping_bookings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(expressions=[(hotelBookingApp.models.DateRange(models.F('check_in_date'), django.db.models.functions.comparison.Greatest(models.F('check_out_date'), models.ExpressionWrapper(django.db.models.expressions.CombinedExpression(models.F('check_in_date'), '+', models.Value(1)), output_field=models.DateField()))), '&&'), ('room', '=')], name='booking_no_overlap', violation_error_message='The room is already booked for the selected dates.'),
+        ),
+    ]
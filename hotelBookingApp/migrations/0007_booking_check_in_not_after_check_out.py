@@ -0,0 +1,40 @@
+# Generated by Django 5.1.5 on 2026-10-15 22:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def check_no_reversed_bookings(apps, schema_editor):
+    """Fail with the offending bookings if any would violate the constraint.
+
+    Before this migration the admin could save a booking that checks out
+    before it checks in. Those rows must be fixed or deleted first.
+    """
+    Booking = apps.get_model('hotelBookingApp', 'Booking')
+    reversed_ids = list(
+        Booking.objects.filter(check_in_date__gt=models.F('check_out_date'))
+        .order_by('pk').values_list('pk', flat=True)
+    )
+    if reversed_ids:
+        raise RuntimeError(
+            "Cannot add the booking_check_in_not_after_check_out constraint, these "
+            "bookings check in after they check out: "
+            f"{', '.join(map(str, reversed_ids))}. Fix their dates or delete them, "
+            "then run the migration again."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotelBookingApp', '0006_booking_no_overlap'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(check_no_reversed_bookings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.CheckConstraint(condition=models.Q(('check_in_date__lte', models.F('check_out_date'))), name='booking_check_in_not_after_check_out', violation_error_message='Check-in date must be before check-out date.'),
+        ),
+    ]
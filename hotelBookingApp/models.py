@@ -1,10 +1,41 @@
 """This module contains the models for the hotel booking application."""
 
 from django.contrib.auth.models import User
+from django.contrib.postgres.constraints import ExclusionConstraint
+# Imported from the package rather than from .ranges: pylint-django's range
+# field shim crashes on the resolved class without psycopg2 installed
+from django.contrib.postgres.fields import ( # pylint: disable=no-name-in-module
+    DateRangeField,
+    RangeOperators,
+)
 from django.db import models
+from django.db.models import ExpressionWrapper, F, Func, Value
+from django.db.models.functions import ExtractDay, Greatest
 from django.utils.timezone import now
 
 
+class DateRange(Func): # pylint: disable=abstract-method
+    """The PostgreSQL daterange() function, [lower, upper) by default.
+    """
+    function = 'DATERANGE'
+    output_field = DateRangeField()
+
+
+# Number of nights between check-in and check-out. If check_in_date and
+# check_out_date are the same, assume 1 night.
+NUMBER_OF_NIGHTS = Greatest(ExtractDay(F('check_out_date') - F('check_in_date')), Value(1))
+
+# Nights for which a booking holds the room. A same-day booking holds the
+# room for the night of check_in_date.
+BOOKED_NIGHTS = DateRange(
+    F('check_in_date'),
+    Greatest(
+        F('check_out_date'),
+        ExpressionWrapper(F('check_in_date') + 1, output_field=models.DateField())
+    )
+)
+
+
 class Room(models.Model):
     """Represents a room in the hotel
 
@@ -51,21 +82,39 @@ class Room(models.Model):
         )
 
 
+class BookingManager(models.Manager): # pylint: disable=too-few-public-methods
+    """Default manager for the Booking model.
+
+    Joins the related room into the initial query so that serializing a
+    list of bookings does not issue one query per row. The user is not
+    joined, bookings only need its id and the username_snapshot.
+    """
+    def get_queryset(self):
+        """Returns the bookings queryset with the room selected.
+        """
+        return super().get_queryset().select_related('room')
+
+
 class Booking(models.Model):
     """Represents a booking made by a user for a specific room.
 
     Attributes:
         user (User): The user who made the booking.
+        username_snapshot (str): The username of the user when the booking
+        was made, used to display the booking without loading the user.
         room (Room): The room that was booked.
         check_in_date (date): The check-in date for the booking.
         check_out_date (date): The check-out date for the booking.
         created_at (datetime): The timestamp when the booking was created.
-        total_booking_price (Decimal): The total price of the booking.
+        price_per_night (Decimal): The room's price per night when the booking
+        was made.
+        total_booking_price (Decimal): The total price of the booking, computed
+        by the database from the number of nights and price_per_night.
         payment_status (string): The payment status of the booking.
 
     Returns:
        __str__(): Returns a string representation of the booking, including
-       the username and room type.
+       the room id and the username.
     """
     PAYMENT_STATUS = [
         ('pending', 'Pending'),
@@ -73,14 +122,20 @@ class Booking(models.Model):
         ('failed', 'Failed'),
     ]
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    username_snapshot = models.CharField(max_length=150, editable=False)
     room = models.ForeignKey(Room, on_delete=models.CASCADE)
     check_in_date = models.DateField(default=now)
     check_out_date = models.DateField(default=now)
-    total_booking_price = models.DecimalField(
+    price_per_night = models.DecimalField(
         max_digits=10,
         decimal_places=2,
-        null=True,
-        blank=True
+        editable=False,
+        help_text="The room's price per night when the booking was made."
+    )
+    total_booking_price = models.GeneratedField(
+        expression=NUMBER_OF_NIGHTS * F('price_per_night'),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True
     )
     created_at = models.DateTimeField(auto_now_add=True)
     payment_status = models.CharField(
@@ -89,42 +144,102 @@ class Booking(models.Model):
         default='pending'
     )
 
+    objects = BookingManager()
+
     class Meta:
         """Metadata for the Booking model.
         """
         ordering = ['-created_at'] # Make the latest booking appear first in records
+        indexes = [
+            # Serves the per-room date overlap check run on every new booking
+            models.Index(
+                fields=['room', 'check_in_date', 'check_out_date'],
+                name='booking_room_dates_idx'
+            ),
+            # Serves the cursor-paginated list of a user's bookings
+            models.Index(
+                fields=['user', '-created_at'],
+                name='booking_user_created_idx'
+            ),
+        ]
+        constraints = [
+            # A same-day booking is allowed and counts as one night
+            models.CheckConstraint(
+                condition=models.Q(check_in_date__lte=F('check_out_date')),
+                name='booking_check_in_not_after_check_out',
+                violation_error_message="Check-in date must be before check-out date."
+            ),
+            # A room can never be booked twice for the same night, whatever
+            # the write path. Needs the btree_gist extension for room.
+            ExclusionConstraint(
+                name='booking_no_overlap',
+                expressions=[
+                    (BOOKED_NIGHTS, RangeOperators.OVERLAPS),
+                    ('room', RangeOperators.EQUAL),
+                ],
+                violation_error_message="The room is already booked for the selected dates."
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Override from_db to remember the loaded room and user, so that save()
+        can tell whether they changed.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values)) # pylint: disable=protected-access
+        return instance
+
+    def _has_changed(self, attname):
+        """Returns whether the field differs from the value loaded from the
+        database. A new booking, or a field that was not loaded, counts as
+        changed.
+        """
+        loaded_values = getattr(self, '_loaded_values', {})
+        return (
+            self._state.adding
+            or attname not in loaded_values
+            or loaded_values[attname] != getattr(self, attname)
+        )
 
     def save(self, *args, **kwargs):
         """
-        Override the save method to calculate the total_booking_price before saving.
+        Override the save method to record the room's price and the username
+        on a new booking, and again whenever the booking is moved to another
+        room or user.
         """
-        if self.check_in_date and self.check_out_date and self.room:
-            num_nights = (self.check_out_date - self.check_in_date).days
-            if num_nights == 0:
-                num_nights = 1
-            self.total_booking_price = num_nights * self.room.price_per_night # pylint: disable=no-member
+        if self.price_per_night is None or self._has_changed('room_id'):
+            self.price_per_night = self.room.price_per_night # pylint: disable=no-member
+        if not self.username_snapshot or self._has_changed('user_id'):
+            self.username_snapshot = self.user.username # pylint: disable=no-member
         super().save(*args, **kwargs)
+        self._loaded_values = { # pylint: disable=attribute-defined-outside-init
+            'room_id': self.room_id,
+            'user_id': self.user_id,
+        }
 
     def __str__(self):
         """Returns a string representation of the Booking object.
         """
+        # Use the stored values so that rendering a booking never queries the
+        # room or user tables
         return (
-            f"""Room type - {self.room.room_type} - number {self.room.id}
-            booked by {self.user.username} from {self.check_in_date} to {self.check_out_date}""" # pylint: disable=no-member
+            f"Booking {self.pk} - Room number - {self.room_id} booked by "
+            f"{self.username_snapshot} from {self.check_in_date} to {self.check_out_date}"
         )
 
 
 class Payment(models.Model):
     """Represents a payment made for a specific booking.
 
-    This model stores the payment details for a booking, including the card information
-    (masked for security), the payment amount, and the timestamp when the payment was created.
+    This model stores the payment details for a booking, including the last four digits
+    of the card (the full card details are never persisted), the payment amount, and the
+    timestamp when the payment was created.
 
     Attributes:
         booking: Each booking can have only one payment.
-        card_number (CharField): The card number used for the payment.
-        card_expiry (CharField): The expiry date of the card in the format MM/YY.
-        cvv (CharField): The CVV (Card Verification Value) of the card.
+        card_last4 (CharField): The last four digits of the card used for the payment.
         amount (DecimalField): The total amount paid for the booking.
         created_at (DateTimeField): The timestamp when the payment was created.
 
@@ -132,22 +247,11 @@ class Payment(models.Model):
         str: A string representation of the payment.
     """
     booking = models.OneToOneField(Booking, on_delete=models.CASCADE, related_name='payment')
-    card_number = models.CharField(max_length=20, help_text="Enter card number")
-    card_expiry = models.CharField(max_length=5, help_text=" Format: MM, YY")
-    card_cvv = models.CharField(max_length=3, help_text=" Format: 3 digits")
+    card_last4 = models.CharField(max_length=4, help_text="Last four digits of the card")
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     created_at = models.DateTimeField(auto_now_add=True)
 
-
-    def save(self, *args, **kwargs):
-        """
-        Override the save method to strip the extra characters from card number.
-        """
-        self.card_number = self.card_number.strip()  # Remove any extra spaces or newlines
-        super().save(*args, **kwargs)
-
-
     def __str__(self):
         """Returns a string representation of the Payment object.
         """
-        return f"Payment for Booking {self.booking.id} - Amount: {self.amount}" # pylint: disable=no-member
+        return f"Payment for Booking {self.booking_id} - Amount: {self.amount}"
@@ -0,0 +1,12 @@
+"""Module for the pagination classes used by the API.
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """Cursor pagination ordered by newest first, matching the models'
+    default `-created_at` ordering
+    """
+    ordering = '-created_at'
+    page_size = 50
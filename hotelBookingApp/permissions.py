@@ -14,4 +14,5 @@ class IsOwner(BasePermission):
         Returns:
             obj: user
         """
-        return obj.user == request.user
+        # Compare ids so that obj.user is not fetched from the database
+        return obj.user_id == request.user.id
@@ -1,8 +1,13 @@
 """Module for serializing the models so that they can be exposed to the API.
 """
 
+import copy
+import re
+
 from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
 from .models import Booking, Payment, Room
 
@@ -12,7 +17,27 @@ from .models import Booking, Payment, Room
 # deserialization, allowing parsed data to be converted back into complex
 # types, after first validating the incoming data.
 
-class RoomSerializer(serializers.ModelSerializer):
+# Card details must be plain ASCII digits
+CARD_NUMBER_RE = re.compile(r'\d{16}', re.ASCII)
+CARD_CVV_RE = re.compile(r'\d{3}', re.ASCII)
+
+# Field mappings of the fixed-schema model serializers, built once per class
+_fields_cache = {}
+
+class CachedFieldsMixin: # pylint: disable=too-few-public-methods
+    """Build the serializer fields once per class instead of per instance
+    ModelSerializer introspects the model and deep-copies the declared
+    fields every time; the cached fields are only shallow-copied here
+    """
+    def get_fields(self):
+        """Return fresh copies of the cached fields for this instance to bind
+        """
+        key = type(self)
+        if key not in _fields_cache:
+            _fields_cache[key] = super().get_fields()
+        return {name: copy.copy(field) for name, field in _fields_cache[key].items()}
+
+class RoomSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serialzier to map the Room model to the JSON format
     Represents the Room model in API responses
     """
@@ -23,7 +48,18 @@ class RoomSerializer(serializers.ModelSerializer):
         model = Room
         fields = ['id', 'room_type', 'price_per_night']
 
-class BookingSerializer(serializers.ModelSerializer):
+class RoomListSerializer(serializers.Serializer): # pylint: disable=abstract-method
+    """Read-only serializer for the room list endpoint
+    Renders `.values()` rows with explicit fields, skipping the model
+    introspection and instance creation of RoomSerializer
+    """
+    id = serializers.IntegerField(read_only=True)
+    room_type = serializers.CharField(read_only=True)
+    price_per_night = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True
+    )
+
+class BookingSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serialzier to map the Booking model to the JSON format
     Represents the Booking model in API responses
@@ -35,7 +71,12 @@ class BookingSerializer(serializers.ModelSerializer):
     )
     check_in_date = serializers.DateField(required=True)  # Explicitly required
     check_out_date = serializers.DateField(required=True)  # Explicitly required
-    number_of_nights = serializers.SerializerMethodField()  # Custom field for number of nights
+    # Generated by the database, declared so it renders like other decimals
+    total_booking_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True
+    )
+    # Annotated on the queryset by the view, set by create() for new bookings
+    number_of_nights = serializers.IntegerField(read_only=True)
 
     class Meta:
         """Meta class to define the model and fields to include in the serializer.
@@ -57,44 +98,66 @@ class BookingSerializer(serializers.ModelSerializer):
 
     def validate(self, data): # pylint: disable=arguments-renamed
         """
-        Validate the booking data to ensure check-in is before check-out
-        and that the room is not already booked for the selected dates.
+        Validate the booking data to ensure check-in is before check-out.
+        Availability is checked by the database when create() inserts.
         """
 
         # Ensure check-in is before check-out
         if data['check_in_date'] > data['check_out_date']:
             raise serializers.ValidationError("Check-in date must be before check-out date.")
 
-
-        # Check if the exact same booking already exists
-        if Booking.objects.filter( # pylint: disable=no-member
-            room=data['room'],
-            check_in_date=data['check_in_date'],
-            check_out_date=data['check_out_date']
-        ).exists():
-            raise serializers.ValidationError("The room is already booked for the selected dates.")
-
-        # Check if the room is already booked for the given dates
-        overlapping_bookings = Booking.objects.filter( # pylint: disable=no-member
-            room=data['room'],
-            check_in_date__lt=data['check_out_date'],
-            check_out_date__gt=data['check_in_date']
-        )
-        if overlapping_bookings.exists():
-            raise serializers.ValidationError("The room is already booked for the selected dates.")
-
         return data
 
-    def get_number_of_nights(self, obj):
+    def create(self, validated_data):
         """
-        Calculate the number of nights for the booking.
+        Create the booking unless the room is already booked for the selected
+        dates, and set its number of nights, which bookings read back through
+        the view get from the queryset annotation.
         """
-        # Calculate the number of nights
-        num_nights = (obj.check_out_date - obj.check_in_date).days
+        try:
+            # The booking_no_overlap constraint rejects a booking that overlaps
+            # another of the same room, so the insert is the availability check.
+            # The savepoint keeps an enclosing transaction usable on failure.
+            with transaction.atomic():
+                booking = super().create(validated_data)
+        except IntegrityError as exc:
+            # Any other integrity error is not about availability
+            constraint = getattr(getattr(exc.__cause__, 'diag', None), 'constraint_name', None)
+            if constraint != 'booking_no_overlap':
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    "The room is already booked for the selected dates."
+                ]
+            }) from exc
+
         # If check_in_date and check_out_date are the same, assume 1 night
-        if num_nights == 0:
-            num_nights = 1
-        return num_nights
+        booking.number_of_nights = max((booking.check_out_date - booking.check_in_date).days, 1)
+        return booking
+
+class BookedRoomSerializer(serializers.Serializer): # pylint: disable=abstract-method
+    """Read-only serializer for the room of a booking list row
+    Reads the room columns that the bookings list joins into each row
+    """
+    id = serializers.IntegerField(source='room_id', read_only=True)
+    room_type = serializers.CharField(source='room__room_type', read_only=True)
+    price_per_night = serializers.DecimalField(
+        source='room__price_per_night', max_digits=10, decimal_places=2, read_only=True
+    )
+
+class BookingListSerializer(serializers.Serializer): # pylint: disable=abstract-method
+    """Read-only serializer for the bookings list endpoint
+    Renders `.values()` rows in the same shape as BookingSerializer
+    """
+    id = serializers.IntegerField(read_only=True)
+    room = BookedRoomSerializer(source='*', read_only=True)
+    check_in_date = serializers.DateField(read_only=True)
+    check_out_date = serializers.DateField(read_only=True)
+    number_of_nights = serializers.IntegerField(read_only=True)
+    total_booking_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True
+    )
+    payment_status = serializers.CharField(read_only=True)
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     """Serialzier to map the User model to the JSON format
@@ -138,31 +201,41 @@ class PaymentSerializer(serializers.ModelSerializer):
     """Serialzier to map the Payment model to the JSON format
     Represents the Payment model in API responses
     """
+    # Card details are accepted for processing but never stored
+    card_number = serializers.CharField(write_only=True, help_text="Enter card number")
+    card_expiry = serializers.CharField(
+        write_only=True, max_length=5, help_text=" Format: MM, YY"
+    )
+    card_cvv = serializers.CharField(write_only=True, help_text=" Format: 3 digits")
+
     class Meta:
         """Meta class to define the model and fields to include in the serializer.
         """
         model = Payment
-        fields = ['id', 'booking', 'card_number', 'card_expiry', 'card_cvv', 'amount', 'created_at']
-        read_only_fields = ['id', 'booking', 'amount', 'created_at']
+        fields = ['id', 'booking', 'card_number', 'card_expiry', 'card_cvv', 'card_last4',
+                  'amount', 'created_at']
+        read_only_fields = ['id', 'booking', 'card_last4', 'amount', 'created_at']
 
     def create(self, validated_data):
         """
-        Create a new Payment instance and returns it with masked card details.
-        Overrides the default `create` method to mask the card number
+        Create a new Payment instance keeping only the last four card digits.
+        Overrides the default `create` method to drop the full card details
         """
-        validated_data['card_number'] = f"**** **** **** {validated_data['card_number'][-4:]}"
+        validated_data['card_last4'] = validated_data.pop('card_number')[-4:]
+        validated_data.pop('card_expiry')
+        validated_data.pop('card_cvv')
         return super().create(validated_data)
 
     def validate_card_number(self, value):
         """Ensures card number is 16 digits
         """
-        if not value.isdigit() or len(value) != 16:
+        if not CARD_NUMBER_RE.fullmatch(value):
             raise serializers.ValidationError("Card number must be 16 digits.")
         return value
 
     def validate_card_cvv(self, value):
         """Ensures CVV is 3 digits
         """
-        if not value.isdigit() or len(value) != 3:
+        if not CARD_CVV_RE.fullmatch(value):
             raise serializers.ValidationError("CVV must be 3 digits.")
         return value
@@ -0,0 +1,29 @@
+"""Module for the signal handlers that keep cached data in sync with the models.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import invalidate_available_rooms, invalidate_room_list
+from .models import Booking, Room
+
+
+@receiver([post_save, post_delete], sender=Room)
+def room_changed(sender, **kwargs): # pylint: disable=unused-argument
+    """Invalidate the cached room list and available rooms whenever a room
+    is saved or deleted, once the change is committed
+    """
+    transaction.on_commit(invalidate_room_list)
+    transaction.on_commit(invalidate_available_rooms)
+
+
+@receiver([post_save, post_delete], sender=Booking)
+def booking_changed(sender, update_fields=None, **kwargs): # pylint: disable=unused-argument
+    """Invalidate the cached available rooms whenever a booking is saved or
+    deleted, once the change is committed
+    """
+    # Room availability does not depend on the payment status
+    if update_fields is not None and update_fields <= {'payment_status'}:
+        return
+    transaction.on_commit(invalidate_available_rooms)
@@ -1,3 +1,323 @@
-from django.test import TestCase
+"""Tests for the hotel booking API.
+"""
 
-# Create your tests here.
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.settings import api_settings
+from rest_framework.test import APITestCase
+
+from .caching import invalidate_room_list, room_list_key
+from .models import Booking, Payment, Room
+from .pagination import CreatedAtCursorPagination
+from .serializers import BookingSerializer
+
+
+class BookingTests(APITestCase):
+    """Tests for creating and listing bookings
+    """
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='guest', password='password')
+        self.client.force_authenticate(self.user)
+        self.room = Room.objects.create(room_type='single', price_per_night='100.00') # pylint: disable=no-member
+
+    def book(self, check_in_date, check_out_date):
+        """Post a booking of the room for the given dates
+        """
+        return self.client.post('/api/bookings/', {
+            'room_id': self.room.id,
+            'check_in_date': check_in_date,
+            'check_out_date': check_out_date,
+        }, format='json')
+
+    def test_overlapping_booking_is_rejected(self):
+        """A booking that overlaps another of the same room returns 400
+        """
+        self.assertEqual(self.book('2030-01-01', '2030-01-04').status_code, status.HTTP_201_CREATED)
+
+        response = self.book('2030-01-03', '2030-01-05')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json()[api_settings.NON_FIELD_ERRORS_KEY],
+            ["The room is already booked for the selected dates."]
+        )
+        self.assertEqual(Booking.objects.count(), 1) # pylint: disable=no-member
+
+    def test_back_to_back_bookings_are_allowed(self):
+        """A booking can start on the day the previous one checks out
+        """
+        self.assertEqual(self.book('2030-01-01', '2030-01-04').status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.book('2030-01-04', '2030-01-05').status_code, status.HTTP_201_CREATED)
+
+    def test_same_day_booking_holds_the_night(self):
+        """A same-day booking holds the room for the night of its check-in date
+        """
+        response = self.book('2030-02-01', '2030-02-01')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['data']['number_of_nights'], 1)
+
+        response = self.book('2030-02-01', '2030-02-02')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.book('2030-02-02', '2030-02-03').status_code, status.HTTP_201_CREATED)
+
+    def test_other_integrity_errors_are_reraised(self):
+        """Only the overlap constraint is turned into a validation error
+        """
+        with self.assertRaises(IntegrityError):
+            BookingSerializer().create({
+                'user': self.user,
+                'room': self.room,
+                'check_in_date': date(2030, 1, 5),
+                'check_out_date': date(2030, 1, 1),
+            })
+
+    def test_moving_booking_reprices_it(self):
+        """A booking moved to another room takes that room's price
+        """
+        suite = Room.objects.create(room_type='suite', price_per_night='300.00') # pylint: disable=no-member
+        self.book('2030-01-01', '2030-01-03')
+        booking = Booking.objects.get() # pylint: disable=no-member
+
+        booking.room = suite
+        booking.save()
+        booking.refresh_from_db()
+
+        self.assertEqual(booking.price_per_night, Decimal('300.00'))
+        self.assertEqual(booking.total_booking_price, Decimal('600.00'))
+
+    def test_reassigning_booking_updates_its_username(self):
+        """A booking given to another user is displayed with that user's name
+        """
+        other_user = get_user_model().objects.create_user(username='other', password='password')
+        self.book('2030-01-01', '2030-01-03')
+        booking = Booking.objects.get() # pylint: disable=no-member
+
+        booking.user = other_user
+        booking.save()
+        booking.refresh_from_db()
+
+        self.assertEqual(booking.username_snapshot, 'other')
+        self.assertIn('booked by other', str(booking))
+
+    def test_saving_booking_keeps_its_price(self):
+        """Saving a booking in the same room keeps the price it was booked at
+        """
+        self.book('2030-01-01', '2030-01-03')
+        Room.objects.filter(pk=self.room.pk).update(price_per_night='150.00') # pylint: disable=no-member
+        booking = Booking.objects.get() # pylint: disable=no-member
+
+        booking.check_out_date = date(2030, 1, 4)
+        booking.save()
+        booking.refresh_from_db()
+
+        self.assertEqual(booking.total_booking_price, Decimal('300.00'))
+
+    @mock.patch.object(CreatedAtCursorPagination, 'page_size', 2)
+    def test_bookings_list_is_paginated(self):
+        """The bookings list is returned in cursor pages, newest first
+        """
+        for day in (1, 3, 5):
+            self.book(f'2030-01-0{day}', f'2030-01-0{day + 1}')
+
+        response = self.client.get('/api/bookings/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        page = response.json()
+        self.assertEqual(set(page), {'next', 'previous', 'results'})
+        self.assertEqual(
+            [booking['check_in_date'] for booking in page['results']],
+            ['2030-01-05', '2030-01-03']
+        )
+        self.assertEqual(page['results'][0]['room']['id'], self.room.id)
+
+        page = self.client.get(page['next']).json()
+        self.assertEqual(
+            [booking['check_in_date'] for booking in page['results']], ['2030-01-01']
+        )
+        self.assertIsNone(page['next'])
+
+
+class PaymentTests(APITestCase):
+    """Tests for paying for a booking
+    """
+    card = {'card_number': '4111111111111111', 'card_expiry': '12/30', 'card_cvv': '987'}
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='guest', password='password')
+        self.client.force_authenticate(self.user)
+        room = Room.objects.create(room_type='single', price_per_night='100.00') # pylint: disable=no-member
+        self.booking = Booking.objects.create( # pylint: disable=no-member
+            user=self.user, room=room,
+            check_in_date=date(2030, 1, 1), check_out_date=date(2030, 1, 3)
+        )
+
+    def pay(self):
+        """Post a payment for the booking with the test card
+        """
+        return self.client.post(
+            f'/api/bookings/{self.booking.id}/payments/', self.card, format='json'
+        )
+
+    def test_payment_keeps_only_card_last4(self):
+        """The card number and CVV are neither returned nor stored
+        """
+        response = self.pay()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        data = response.json()['data']
+        self.assertEqual(data['card_last4'], '1111')
+        for field in ('card_number', 'card_expiry', 'card_cvv'):
+            self.assertNotIn(field, data)
+
+        stored = Payment.objects.values().get() # pylint: disable=no-member
+        self.assertEqual(stored['card_last4'], '1111')
+        self.assertEqual(stored['booking_id'], self.booking.id)
+        for value in stored.values():
+            self.assertNotIn(self.card['card_number'], str(value))
+            self.assertNotIn(self.card['card_cvv'], str(value))
+
+    def test_payment_completes_booking(self):
+        """Paying for a booking marks its payment status as completed
+        """
+        self.assertEqual(self.booking.payment_status, 'pending')
+
+        self.pay()
+        self.booking.refresh_from_db()
+
+        self.assertEqual(self.booking.payment_status, 'completed')
+
+    def test_second_payment_is_rejected(self):
+        """A booking that is already paid for cannot be paid again
+        """
+        self.assertEqual(self.pay().status_code, status.HTTP_201_CREATED)
+
+        response = self.pay()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {"error": "Payment already completed for this booking."})
+        self.assertEqual(Payment.objects.count(), 1) # pylint: disable=no-member
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+})
+class AvailableRoomsTests(APITestCase):
+    """Tests for the cached available rooms endpoint
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='guest', password='password')
+        self.client.force_authenticate(self.user)
+        self.room = Room.objects.create(room_type='suite', price_per_night='300.00') # pylint: disable=no-member
+
+    def available_room_ids(self):
+        """Return the ids of the rooms available for the test dates
+        """
+        response = self.client.get('/api/rooms/available/', {
+            'check_in_date': '2030-01-01', 'check_out_date': '2030-01-03'
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [room['id'] for rooms in response.json().values() for room in rooms]
+
+    def test_availability_follows_bookings(self):
+        """Creating or deleting a booking invalidates the cached availability
+        """
+        self.assertEqual(self.available_room_ids(), [self.room.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/bookings/', {
+                'room_id': self.room.id,
+                'check_in_date': '2030-01-02',
+                'check_out_date': '2030-01-04',
+            }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.available_room_ids(), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/bookings/{response.json()['data']['id']}/")
+        self.assertEqual(self.available_room_ids(), [self.room.id])
+
+    def test_availability_matches_booking_rules(self):
+        """A room is available exactly for the stays that can be booked
+        """
+        self.client.post('/api/bookings/', {
+            'room_id': self.room.id,
+            'check_in_date': '2030-01-02',
+            'check_out_date': '2030-01-04',
+        }, format='json')
+
+        for check_in_date, check_out_date, available in (
+            ('2030-01-04', '2030-01-05', True), # Checks in on the check-out day
+            ('2030-01-01', '2030-01-02', True), # Checks out on the check-in day
+            ('2030-01-03', '2030-01-03', False), # Same-day stay on a booked night
+            ('2030-01-04', '2030-01-04', True), # Same-day stay on a free night
+        ):
+            response = self.client.get('/api/rooms/available/', {
+                'check_in_date': check_in_date, 'check_out_date': check_out_date
+            })
+            room_ids = [room['id'] for rooms in response.json().values() for room in rooms]
+            self.assertEqual(self.room.id in room_ids, available, (check_in_date, check_out_date))
+
+            response = self.client.post('/api/bookings/', {
+                'room_id': self.room.id,
+                'check_in_date': check_in_date,
+                'check_out_date': check_out_date,
+            }, format='json')
+            self.assertEqual(
+                response.status_code == status.HTTP_201_CREATED, available,
+                (check_in_date, check_out_date)
+            )
+            if available:
+                self.client.delete(f"/api/bookings/{response.json()['data']['id']}/")
+
+    def test_invalid_query_is_rejected(self):
+        """Malformed dates and unknown room types return 400
+        """
+        response = self.client.get('/api/rooms/available/', {
+            'check_in_date': '20300101', 'check_out_date': '2030-01-03'
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get('/api/rooms/available/', {
+            'check_in_date': '2030-01-01', 'check_out_date': '2030-01-03',
+            'room_type': 'penthouse'
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+})
+class RoomListTests(APITestCase):
+    """Tests for the cached room list endpoint
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='guest', password='password')
+        self.client.force_authenticate(self.user)
+        Room.objects.create(room_type='single', price_per_night='100.00') # pylint: disable=no-member
+
+    def test_room_list_follows_rooms(self):
+        """Saving a room invalidates the cached room list
+        """
+        self.assertEqual(self.client.get('/api/rooms/').json()['TOTAL ROOMS'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Room.objects.create(room_type='suite', price_per_night='300.00') # pylint: disable=no-member
+        self.assertEqual(self.client.get('/api/rooms/').json()['TOTAL ROOMS'], 2)
+
+    def test_stale_rebuild_is_not_served(self):
+        """A list built from before an invalidation is not served after it
+        """
+        stale_key = room_list_key()
+        invalidate_room_list()
+        cache.set(stale_key, {'TOTAL ROOMS': 0})
+
+        self.assertEqual(self.client.get('/api/rooms/').json()['TOTAL ROOMS'], 1)
@@ -3,7 +3,13 @@ ViewSets automatically provides `list`, `create`, `retrieve`,
 `update` and `destroy` actions.
 """
 
-from django.db.models import Q
+from datetime import datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, OuterRef
 from drf_spectacular.utils import extend_schema
 from rest_framework import permissions, status, viewsets
 from rest_framework.authtoken.models import Token
@@ -13,15 +19,29 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Booking, Payment, Room
+from .caching import (
+    AVAILABLE_ROOMS_TIMEOUT,
+    ROOM_LIST_TIMEOUT,
+    available_rooms_key,
+    room_list_key,
+)
+from .models import BOOKED_NIGHTS, NUMBER_OF_NIGHTS, Booking, Payment, Room
+from .pagination import CreatedAtCursorPagination
 from .permissions import IsOwner
 from .serializers import (
+    BookingListSerializer,
     BookingSerializer,
     PaymentSerializer,
+    RoomListSerializer,
     RoomSerializer,
     UserRegistrationSerializer,
 )
 
+# The read-only list serializers need no per-request context, so one instance
+# of each is built at import and shared by every request
+ROOM_LIST_SERIALIZER = RoomListSerializer(many=True)
+BOOKING_LIST_SERIALIZER = BookingListSerializer(many=True)
+
 
 class RoomViewSet(viewsets.ModelViewSet):
     """A simple viewSet for viewing rooms
@@ -59,32 +79,71 @@ class RoomViewSet(viewsets.ModelViewSet):
         status=400
     )
 
-        # Filter rooms NOT booked for the given date range using Booking Model
-        booked_rooms = Booking.objects.filter( # pylint: disable=no-member
-            Q(check_in_date__lte=check_out_date) & Q(check_out_date__gte=check_in_date)
-        ).values_list('room_id', flat=True)
+        # Parse the dates once, so that malformed dates are rejected up front
+        try:
+            check_in_date = datetime.strptime(check_in_date, "%Y-%m-%d").date()
+            check_out_date = datetime.strptime(check_out_date, "%Y-%m-%d").date()
+        except ValueError:
+            return Response(
+                {"error": "Dates must be in the YYYY-MM-DD format."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if check_in_date > check_out_date:
+            return Response(
+                {"error": "Check-in date must be before check-out date."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Only known room types are accepted, so that arbitrary strings do not
+        # each create a cache entry
+        room_types = [value for value, _ in Room.ROOM_TYPES]
+        if room_type and room_type not in room_types:
+            return Response(
+                {"error": f"room_type must be one of: {', '.join(room_types)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # The response is cached until a room or booking is saved or deleted
+        grouped_data = cache.get_or_set(
+            available_rooms_key(check_in_date, check_out_date, room_type),
+            lambda: self.get_available_rooms_data(check_in_date, check_out_date, room_type),
+            AVAILABLE_ROOMS_TIMEOUT
+        )
+        return Response(grouped_data)
+
+    def get_available_rooms_data(self, check_in_date, check_out_date, room_type):
+        """Build the available rooms response data, grouped by room type.
+        """
+        # Nights the requested stay would hold the room for, with the same rule
+        # as the booking_no_overlap constraint: a same-day stay holds one night
+        nights = (check_in_date, max(check_out_date, check_in_date + timedelta(days=1)))
+
+        # Bookings of a room that hold any of those nights using Booking Model
+        room_bookings = Booking.objects.annotate( # pylint: disable=no-member
+            booked_nights=BOOKED_NIGHTS
+        ).filter(room=OuterRef('pk'), booked_nights__overlap=nights)
 
-        # exclude these booked rooms from the list of all rooms
-        available_rooms = Room.objects.exclude(id__in=booked_rooms) # pylint: disable=no-member
+        # Keep the rooms that have no such booking, as a NOT EXISTS anti-join
+        available_rooms = Room.objects.filter(~Exists(room_bookings)) # pylint: disable=no-member
 
         # If room_type is provided, filter by room type
         if room_type:
             available_rooms = available_rooms.filter(room_type=room_type)
 
-        # Serialize the available rooms
-        serializer = self.get_serializer(available_rooms, many=True)
-        data = serializer.data
-
-        # Group rooms by room_type using a dictionary
-        grouped_data = {}
-        for room in data:
-            room_type = room["room_type"]
-            if room_type not in grouped_data:
-                grouped_data[room_type] = []
-            grouped_data[room_type].append(room)
+        # Serialize the available rooms from plain rows, as the room list does.
+        # The rows are sorted by room_type so that each type is one run.
+        data = ROOM_LIST_SERIALIZER.to_representation(
+            available_rooms.order_by('room_type', '-created_at').values(
+                'id', 'room_type', 'price_per_night'
+            )
+        )
 
-        # Return the grouped data
-        return Response(grouped_data)
+        # Group rooms by room_type in a single pass over the sorted rows
+        return {
+            room_type: list(rooms)
+            for room_type, rooms in groupby(data, key=itemgetter('room_type'))
+        }
 
 
     def create(self, request, *args, **kwargs):
@@ -106,9 +165,20 @@ class RoomViewSet(viewsets.ModelViewSet):
 
     def list(self, request, *args, **kwargs):
         """Override the list method to include room counts.
+        The response is cached until a room is saved or deleted.
+        """
+        response_data = cache.get_or_set(
+            room_list_key(), self.get_room_list_data, ROOM_LIST_TIMEOUT
+        )
+        return Response(response_data)
+
+    def get_room_list_data(self):
+        """Build the room list response data with the room counts.
         """
         queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
+        data = ROOM_LIST_SERIALIZER.to_representation(
+            queryset.values('id', 'room_type', 'price_per_night')
+        )
 
         # Count rooms by type
         total_rooms = queryset.count()
@@ -122,9 +192,9 @@ class RoomViewSet(viewsets.ModelViewSet):
             "Single Rooms": single_rooms,
             "Double Rooms": double_rooms,
             "Suites Rooms": suite_rooms,
-            "rooms": serializer.data,
+            "rooms": data,
         }
-        return Response(response_data)
+        return response_data
 
 
 class BoookingViewSet(viewsets.ModelViewSet):
@@ -135,6 +205,7 @@ class BoookingViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, IsOwner] # Only logged-in users can book
     # permission_classes = [permissions.AllowAny]
     http_method_names = ['get', 'post','delete'] # Only allow these requests
+    pagination_class = CreatedAtCursorPagination
 
     def perform_create(self, serializer):
         """Create a new booking and associate it with the logged-in user
@@ -146,7 +217,31 @@ class BoookingViewSet(viewsets.ModelViewSet):
         """View all bookings for the logged-in user
         """
         # Allow users to view only their own bookings
-        return self.queryset.filter(user=self.request.user)
+        return self.queryset.filter(user=self.request.user).only(
+            # Only load the columns that BookingSerializer renders, and
+            # created_at for the pagination cursor
+            'id', 'check_in_date', 'check_out_date', 'total_booking_price',
+            'payment_status', 'created_at', 'user_id', 'room__id', 'room__room_type',
+            'room__price_per_night'
+        ).annotate(
+            number_of_nights=NUMBER_OF_NIGHTS
+        )
+
+    def list(self, request, *args, **kwargs):
+        """Override the list method to render the bookings from plain rows
+        instead of Booking and Room instances.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            'id', 'room_id', 'room__room_type', 'room__price_per_night', 'check_in_date',
+            'check_out_date', 'number_of_nights', 'total_booking_price', 'payment_status',
+            'created_at'
+        )
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(BOOKING_LIST_SERIALIZER.to_representation(page))
+
+        return Response(BOOKING_LIST_SERIALIZER.to_representation(queryset))
 
     def create(self, request, *args, **kwargs):
         """Override the create method to return a custom success message
@@ -183,14 +278,18 @@ class LoginView(ObtainAuthToken):
     def post(self, request, *args, **kwargs):
         """Generate and return an authentication token for the user
         """
-        response = super().post(request, *args, **kwargs)
-        token = Token.objects.get(key=response.data['token']) # pylint: disable=no-member
+        # Authenticate here rather than through super().post() so that the
+        # authenticated user is reused instead of reloaded through the token
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data['user']
+        token, _ = Token.objects.get_or_create(user=user) # pylint: disable=no-member
         return Response(
             {
                 'data': {
                     'token': token.key,
-                    'user_id': token.user_id,
-                    'username': token.user.username,
+                    'user_id': user.id,
+                    'username': user.username,
                 },
                 'message': 'Login successful'
             }
@@ -220,9 +319,12 @@ class UserRegistrationView(APIView):
         """
         serializer = UserRegistrationSerializer(data=request.data)
         if serializer.is_valid():
-            user =  serializer.save()
-            # Generate a token for the user
-            token = Token.objects.create(user=user) # pylint: disable=no-member
+            # Create the user and its token together, so that a failure
+            # cannot leave a user without a token
+            with transaction.atomic():
+                user =  serializer.save()
+                # Generate a token for the user
+                token, _ = Token.objects.get_or_create(user=user) # pylint: disable=no-member
             return Response({
                 "message": "User registered successfully.",
                 "token": token.key
@@ -239,13 +341,18 @@ class PaymentViewSet(viewsets.ModelViewSet):
     serializer_class = PaymentSerializer
     permission_classes = [IsAuthenticated]
 
+    @transaction.atomic
     def create(self, request, *args, **kwargs):
         """Create a payment for a specific booking.
+        The payment and the booking status are written in one transaction.
         """
         booking_id = kwargs.get('booking_id')
         try:
-            # Retrieve the booking object and user
-            booking = Booking.objects.get(id=booking_id, user=request.user) # pylint: disable=no-member
+            # Retrieve the booking object and user, locking the booking so that
+            # concurrent payments for it are handled one after the other
+            booking = Booking.objects.select_for_update(of=('self',)).get( # pylint: disable=no-member
+                id=booking_id, user=request.user
+            )
         except Booking.DoesNotExist: # pylint: disable=no-member
             return Response(
                 {"error": "Booking not found or not authorized."},
@@ -273,7 +380,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
         if payment_successful:
             serializer.save(booking=booking, amount=booking.room.price_per_night)
             booking.payment_status = 'completed'
-            booking.save()
+            booking.save(update_fields=['payment_status'])
             return Response(
                 {
                 "data": serializer.data,
@@ -283,5 +390,5 @@ class PaymentViewSet(viewsets.ModelViewSet):
             )
         else:
             booking.payment_status = 'failed'
-            booking.save()
+            booking.save(update_fields=['payment_status'])
             return Response({"error": "Payment failed."}, status=status.HTTP_400_BAD_REQUEST)